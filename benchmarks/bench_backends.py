@@ -0,0 +1,72 @@
+"""
+Measures the throughput of the server backend pool with 1..N local stand-in backends.
+
+Each stand-in is a userspace evaluator which holds its lock for a fixed time,
+like a chardev handle blocked in write()/read(). Run from the project root:
+
+    python3 -m benchmarks.bench_backends --backends 1 2 4 8
+"""
+import argparse
+import logging
+import threading
+import time
+
+from ipc.server.backends import EvaluatorBackend
+from ipc.server.backend_pool import BackendPool, STRATEGIES
+
+
+class StandInBackend(EvaluatorBackend):
+    def __init__(self, name, latency):
+        super().__init__(name)
+        self.latency = latency
+
+    def evaluate(self, expression):
+        time.sleep(self.latency)
+        return super().evaluate(expression)
+
+
+def run(backend_count, strategy, clients, requests, latency):
+    pool = BackendPool(
+        [StandInBackend(f"stand-in-{i}", latency) for i in range(backend_count)],
+        strategy,
+    )
+    pool.open()
+
+    def client(client_id):
+        for i in range(requests):
+            pool.execute(f"{client_id} + {i}")
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    pool.close()
+
+    total = clients * requests
+    per_backend = ", ".join(str(entry["requests"]) for entry in pool.stats())
+    print(
+        f"{strategy:>5} | backends {backend_count:>2} | {total / elapsed:10.0f} req/s"
+        f" | per backend: {per_backend}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--strategy", choices=STRATEGIES, nargs="+", default=STRATEGIES)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0005, help="seconds")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    for strategy in args.strategy:
+        for backend_count in args.backends:
+            run(backend_count, strategy, args.clients, args.requests, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures the throughput of the pooled Python client with growing pool sizes.
+
+The server runs in a child process with local stand-in backends which hold
+their lock for a fixed time, like a chardev handle. Run from the project root:
+
+    python3 -m benchmarks.bench_client_pool --pool-sizes 1 2 4 8
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.bench_backends import StandInBackend
+from ipc.py_client.client import Client
+from ipc.server.server import Server
+
+
+def serve(socket_path, backend_count, latency):
+    logging.disable(logging.CRITICAL)
+    backends = [StandInBackend(f"stand-in-{i}", latency) for i in range(backend_count)]
+    Server(socket_path, backends).run()
+
+
+def run(socket_path, pool_size, requests):
+    expressions = [f"{i} + {i}" for i in range(requests)]
+    with Client(socket_path, pool_size=pool_size) as client:
+        client.connect(pool_size)
+        start = time.perf_counter()
+        for _ in client.map(expressions):
+            pass
+        elapsed = time.perf_counter() - start
+    print(f"pool size {pool_size:>2} | {requests / elapsed:10.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--backends", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0005, help="seconds")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "math_chardev.socket")
+        server = multiprocessing.Process(
+            target=serve, args=(socket_path, args.backends, args.latency), daemon=True
+        )
+        server.start()
+        while not os.path.exists(socket_path):
+            time.sleep(0.05)
+
+        try:
+            for pool_size in args.pool_sizes:
+                run(socket_path, pool_size, args.requests)
+        finally:
+            server.kill()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares the raw file descriptor I/O of the DeviceManager with the previous buffered file path.
+
+A regular file on tmpfs stands in for the chardev: the written "result" is
+read back from offset 0. Run from the project root:
+
+    python3 -m benchmarks.bench_device_io --requests 100000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from ipc.server.device_manager import DeviceManager
+
+
+class BufferedDeviceManager:
+    """The previous implementation: write, flush, seekable, seek, read, decode, strip."""
+
+    READ_BUFFER_SIZE = 256
+
+    def __init__(self, device_path):
+        self.device_file = open(device_path, "rb+", buffering=0)
+
+    def write_to_device(self, data):
+        self.device_file.write(data.encode("utf-8"))
+        self.device_file.flush()
+        return 0
+
+    def read_from_device(self):
+        if not self.device_file.seekable():
+            return None
+        self.device_file.seek(0)
+        return self.device_file.read(self.READ_BUFFER_SIZE).decode("utf-8").strip()
+
+    def close_device(self):
+        self.device_file.close()
+
+
+def run(name, device, read, requests, rounds):
+    elapsed = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            device.write_to_device("2147483647\n")
+            read()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(
+        f"{name:>8} | {requests / elapsed:10.0f} req/s | {elapsed / requests * 1e6:6.2f} us/req"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=5, help="best of N rounds")
+    parser.add_argument(
+        "--dir",
+        default="/dev/shm" if os.path.isdir("/dev/shm") else None,
+        help="Directory of the stand-in file (default: /dev/shm)",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = os.path.join(directory, "math_chardev")
+
+        open(path, "wb").close()
+        buffered = BufferedDeviceManager(path)
+        run("buffered", buffered, buffered.read_from_device, args.requests, args.rounds)
+        buffered.close_device()
+
+        open(path, "wb").close()
+        raw = DeviceManager(path, measure_latency=False)
+        raw.open_device()
+        run("raw fd", raw, raw.read_result, args.requests, args.rounds)
+        raw.close_device()
+
+        open(path, "wb").close()
+        raw = DeviceManager(path)
+        raw.open_device()
+        run("+latency", raw, raw.read_result, args.requests, args.rounds)
+        raw.close_device()
+
+        for op, stats in raw.stats().items():
+            print(
+                f"{op:>8} | calls {stats['calls']:>8} | syscalls {stats['syscalls']:>8}"
+                f" | {stats['avg_us']:6.2f} us/op"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measures the lookup latency and the warm-restart hit rate of the shared result cache.
+
+The cache is filled with a workload, closed and reopened from the same file
+as a restarted server or client would. Run from the project root:
+
+    python3 -m benchmarks.bench_result_cache --expressions 50000
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from ipc.common.result_cache import DEFAULT_SLOTS, ResultCache
+from ipc.server.backends import evaluate_expression
+
+
+def make_workload(count, seed):
+    rng = random.Random(seed)
+    operators = "+-*/"
+    return [
+        f"{rng.randint(-1000, 1000)} {rng.choice(operators)} {rng.randint(-1000, 1000)}"
+        for _ in range(count)
+    ]
+
+
+def per_call_ns(function, arguments, rounds=3):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for argument in arguments:
+            function(argument)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(arguments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--expressions", type=int, default=50000)
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    workload = make_workload(args.expressions, args.seed)
+    misses = make_workload(args.expressions, args.seed + 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results")
+
+        cache = ResultCache(path, args.slots)
+        start = time.perf_counter_ns()
+        for expression in workload:
+            cache.store(expression, *evaluate_expression(expression))
+        store_ns = (time.perf_counter_ns() - start) / len(workload)
+        cache.close()
+
+        # Warm restart
+        cache = ResultCache(path)
+        hits = sum(cache.lookup(expression) is not None for expression in workload)
+        print(f"slots {cache.slot_count}, expressions {len(workload)}")
+        print(f"warm restart hit rate   {hits / len(workload):8.2%}")
+        print(f"store                   {store_ns:8.0f} ns/op")
+        print(f"lookup, hit             {per_call_ns(cache.lookup, workload):8.0f} ns/op")
+        print(f"lookup, miss            {per_call_ns(cache.lookup, misses):8.0f} ns/op")
+        print(
+            f"userspace evaluation    {per_call_ns(evaluate_expression, workload):8.0f} ns/op"
+        )
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Measures the startup of the entry points and of a one-shot CLI request.
+
+The import times are the cumulative times reported by python3 -X importtime,
+the best of a few runs. The one-shot request `client.py -c "1 + 2"` is timed
+end to end against a server in a child process, once connecting to the
+server directly and once through a running client daemon. Run from the
+project root:
+
+    python3 -m benchmarks.bench_startup --runs 20
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ipc.py_client.client import SERVER_SOCKET_ENV
+from ipc.py_client.oneshot import DAEMON_SOCKET_ENV
+from ipc.server.backends import EvaluatorBackend
+from ipc.server.server import Server
+
+MODULES = (
+    "ipc.common.protocol",
+    "ipc.py_client.oneshot",
+    "ipc.py_client.client",
+    "ipc.server.server",
+)
+ONESHOT = [sys.executable, "-m", "ipc.py_client.client", "-c", "1 + 2"]
+
+
+def serve(socket_path):
+    logging.disable(logging.CRITICAL)
+    Server(socket_path, [EvaluatorBackend("evaluator")]).run()
+
+
+def wait_for(path):
+    while not os.path.exists(path):
+        time.sleep(0.05)
+
+
+def import_time_us(module):
+    """Cumulative import time of the module in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise RuntimeError(f"{module} missing from the -X importtime output")
+
+
+def median_ms(runs, command, env, expected=""):
+    """Median wall time of the command, checking its output."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        times.append((time.perf_counter() - start) * 1000)
+        if result.stdout != expected:
+            raise RuntimeError(f"Unexpected output of {command}: {result.stderr}")
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    for module in MODULES:
+        best = min(import_time_us(module) for _ in range(args.runs))
+        print(f"import {module:<22} | {best / 1000:7.1f} ms")
+
+    startup = median_ms(args.runs, [sys.executable, "-c", "pass"], None)
+    print(f"{'interpreter startup':<29} | {startup:7.1f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "math_chardev.socket")
+        daemon_path = os.path.join(directory, "client.socket")
+        env = dict(os.environ)
+        env[SERVER_SOCKET_ENV] = socket_path
+        env[DAEMON_SOCKET_ENV] = daemon_path
+
+        server = multiprocessing.Process(target=serve, args=(socket_path,), daemon=True)
+        server.start()
+        wait_for(socket_path)
+        daemon = None
+        try:
+            direct = median_ms(args.runs, ONESHOT, env, "3\n")
+            print(f"{'one-shot, direct':<29} | {direct:7.1f} ms")
+
+            daemon = subprocess.Popen(
+                [sys.executable, "-m", "ipc.py_client.client", "--daemon"],
+                env=env,
+                stderr=subprocess.DEVNULL,
+            )
+            wait_for(daemon_path)
+            warm = median_ms(args.runs, ONESHOT, env, "3\n")
+            print(f"{'one-shot, client daemon':<29} | {warm:7.1f} ms")
+        finally:
+            if daemon is not None:
+                daemon.terminate()
+                daemon.wait()
+            server.kill()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
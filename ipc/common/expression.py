@@ -0,0 +1,30 @@
+import errno
+import re
+from typing import Optional, Tuple
+
+# Errno values the chardev returns for a well-formed request it refuses to compute.
+# They are valid answers, so they never mark a backend as unhealthy.
+COMPUTE_ERRNOS = frozenset(
+    (errno.EDOM, errno.EINVAL, errno.ERANGE, errno.EOVERFLOW)
+)
+
+# Mirrors the limits of the kernel module
+S32_MAX = 2147483647
+S32_MIN = -S32_MAX - 1
+MAX_EXPRESSION_SIZE = 128
+
+# Same shape as sscanf("%lld %c %lld") in math_chardev_write(), the kernel
+# %lld accepts a leading "-" but no "+". %c reads a single byte, the first
+# byte of a multi-byte UTF-8 operator makes the second %lld fail.
+EXPRESSION_PATTERN = re.compile(
+    r"\s*(-?\d+)(?!\d)\s*([!-~])\s*(-?\d+)(?!\d)\s*", re.ASCII
+)
+
+
+def parse_expression(expression: str) -> Optional[Tuple[int, str, int]]:
+    """Splits an expression into (operand1, operator, operand2), None if it doesn't parse."""
+    match = EXPRESSION_PATTERN.fullmatch(expression)
+    if match is None:
+        return None
+    operand1, operator, operand2 = match.groups()
+    return int(operand1), operator, int(operand2)
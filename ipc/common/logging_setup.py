@@ -0,0 +1,8 @@
+import logging
+
+LOG_FORMAT = "%(asctime)s | %(levelname)-5s | %(threadName)s | %(message)s"
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Configures the root logger, called by the entry points instead of at import."""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
@@ -3,11 +3,6 @@ import zlib
 import logging
 from typing import Optional
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)-5s | %(threadName)s | %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +41,7 @@ class Protocol:
     )
     # Last part of the message
     CRC_SIZE = 4  # Bytes
+    _packed_service_announcement: Optional[bytes] = None
 
     @classmethod
     def create_message(cls, type: int, payload: str) -> Message:
@@ -55,6 +51,15 @@ class Protocol:
     def create_service_announcement(cls) -> Message:
         return cls.create_message(cls.SERVICE_ANNOUNC_T, cls.SERVICE_ANNOUNCE_PAYLOAD)
 
+    @classmethod
+    def packed_service_announcement(cls) -> bytes:
+        """The service announcement never changes, it is packed on first use only."""
+        if cls._packed_service_announcement is None:
+            cls._packed_service_announcement = cls.pack_message(
+                cls.create_service_announcement()
+            )
+        return cls._packed_service_announcement
+
     @classmethod
     def pack_message(cls, message: Message) -> bytes:
         # Pad the payload with a padding byte at the beginning and end
@@ -90,13 +95,3 @@ class Protocol:
         # Return the unpacked message
         return Message(type, payload.decode(), unpacked_crc)
 
-
-# Usage example
-service_message = Protocol.create_service_announcement()
-packed_service_message = Protocol.pack_message(service_message)
-logger.debug(f"Packed Service Message: {packed_service_message}")
-hex_representation = " ".join(f"{byte:02x}" for byte in packed_service_message)
-logger.debug(f"Packed Service Message (Hex): {hex_representation}")
-
-unpacked_service_message = Protocol.unpack_message(packed_service_message)
-logger.debug(f"Unpacked Service Message: {unpacked_service_message.payload}")
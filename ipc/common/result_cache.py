@@ -0,0 +1,219 @@
+import fcntl
+import logging
+import mmap
+import os
+import random
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from ipc.common.expression import (
+    COMPUTE_ERRNOS,
+    MAX_EXPRESSION_SIZE,
+    S32_MAX,
+    S32_MIN,
+    parse_expression,
+)
+
+# File layout: header followed by slot_count fixed-width slots
+MAGIC = b"MATHRC01"
+HEADER_FORMAT = "<8sII"  # magic, slot count, slot size
+HEADER_SIZE = 64
+# (<) - Little endian, no padding: seq, operand1, operand2, operator, state, errno, result
+SLOT = struct.Struct("<IiiBBxxii")
+SLOT_BODY = struct.Struct("<iiBBxxii")
+SEQ = struct.Struct("<I")
+KEY = struct.Struct("<iBi")
+
+SLOT_EMPTY = 0
+SLOT_USED = 1
+
+DEFAULT_SLOTS = 65536
+PROBE_LIMIT = 8  # Slots probed per key, the eviction window of an insert
+SEQLOCK_RETRIES = 4
+
+# (operand1, operator code, operand2)
+CacheKey = Tuple[int, int, int]
+
+
+def make_key(expression: str) -> Optional[CacheKey]:
+    """Returns the cache key of an expression, None if it can't be cached."""
+    if len(expression) >= MAX_EXPRESSION_SIZE:
+        return None
+    parsed = parse_expression(expression)
+    if parsed is None:
+        return None
+    operand1, operator, operand2 = parsed
+    # Parentheses are refused by the chardev, whatever the operator
+    if "(" in expression or ")" in expression:
+        return None
+    if not (S32_MIN <= operand1 <= S32_MAX and S32_MIN <= operand2 <= S32_MAX):
+        return None
+    return operand1, ord(operator), operand2
+
+
+class ResultCache:
+    """
+    Results shared by every process mapping the same file.
+
+    A fixed-size open-addressing hash table of fixed-width slots in an mmap'd
+    file, so it also survives restarts. Reads are lock-free: every slot has a
+    seqlock counter which is odd while the slot is being written, a reader
+    retries when the counter changed under it. Writers serialize on flock(),
+    a full probe window evicts a random slot.
+
+    Results are (errno, result) tuples like the ones of the server backends.
+    Every process mapping the file can store results which the server then
+    returns to its clients, so the file is created readable and writable by
+    its owner and group only. Processes of other users share it through a
+    common group.
+    """
+
+    def __init__(self, path: str, slots: int = DEFAULT_SLOTS):
+        if slots < 1:
+            raise ValueError("The result cache needs at least one slot")
+        self.path = path
+        self.write_lock = threading.Lock()  # flock() doesn't exclude threads
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o660)
+        try:
+            with self._locked():
+                self.slot_count = self._init_file(slots)
+            self.map = mmap.mmap(self.fd, HEADER_SIZE + self.slot_count * SLOT.size)
+        except Exception:
+            os.close(self.fd)
+            raise
+        # Probe windows don't wrap around, the last one starts at last_window
+        self.last_window = max(self.slot_count - PROBE_LIMIT, 0)
+        self.window_size = min(PROBE_LIMIT, self.slot_count) * SLOT.size
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.retries = 0
+
+    def _init_file(self, slots: int) -> int:
+        """Validates the header of an existing table or creates an empty one."""
+        size = os.fstat(self.fd).st_size
+        if size >= HEADER_SIZE:
+            header = os.pread(self.fd, struct.calcsize(HEADER_FORMAT), 0)
+            magic, slot_count, slot_size = struct.unpack(HEADER_FORMAT, header)
+            if magic == MAGIC and slot_count < 1:
+                raise ValueError(f"Result cache {self.path} has no slots")
+            if (
+                magic == MAGIC
+                and slot_size == SLOT.size
+                and size == HEADER_SIZE + slot_count * slot_size
+            ):
+                return slot_count
+            logging.warning(f"Invalid result cache {self.path}, recreating it")
+
+        os.ftruncate(self.fd, 0)
+        os.ftruncate(self.fd, HEADER_SIZE + slots * SLOT.size)
+        os.pwrite(self.fd, struct.pack(HEADER_FORMAT, MAGIC, slots, SLOT.size), 0)
+        return slots
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self.write_lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _probe(self, key: CacheKey) -> range:
+        """Offsets of the slots which may hold the key."""
+        start = min(zlib.crc32(KEY.pack(*key)) % self.slot_count, self.last_window)
+        offset = HEADER_SIZE + start * SLOT.size
+        return range(offset, offset + self.window_size, SLOT.size)
+
+    def lookup(self, expression: str) -> Optional[Tuple[int, Optional[str]]]:
+        """Returns the cached (errno, result) of the expression, None on a miss."""
+        key = make_key(expression)
+        if key is None:
+            return None
+        operand1, operator, operand2 = key
+
+        cache_map = self.map
+        for offset in self._probe(key):
+            for _ in range(SEQLOCK_RETRIES):
+                seq, o1, o2, op, state, error, result = SLOT.unpack_from(
+                    cache_map, offset
+                )
+                if o1 != operand1 or o2 != operand2 or op != operator:
+                    # A torn read of another key can only turn into a miss,
+                    # only a match is validated by the seqlock
+                    break
+                if not seq & 1 and SEQ.unpack_from(cache_map, offset)[0] == seq:
+                    self.hits += 1
+                    return error, (str(result) if error == 0 else None)
+                self.retries += 1
+            else:
+                break  # The slot is busy, treat it as a miss
+
+            if state == SLOT_EMPTY:
+                break
+
+        self.misses += 1
+        return None
+
+    def store(self, expression: str, error: int, result: Optional[str]) -> bool:
+        """
+        Stores the result of an expression.
+
+        Only results and the compute errnos of the chardev are cached, they
+        don't depend on the backend.
+
+        Returns:
+            bool: True if the result was stored
+        """
+        if error != 0 and error not in COMPUTE_ERRNOS:
+            return False
+        key = make_key(expression)
+        if key is None:
+            return False
+        value = 0
+        if error == 0:
+            value = int(result)
+            if not S32_MIN <= value <= S32_MAX:
+                return False
+
+        with self._locked():
+            offsets = self._probe(key)
+            for offset in offsets:
+                _, o1, o2, op, state, _, _ = SLOT.unpack_from(self.map, offset)
+                if state == SLOT_EMPTY or (o1, op, o2) == key:
+                    break
+            else:
+                offset = random.choice(offsets)
+                self.evictions += 1
+            self._write_slot(offset, key, error, value)
+        self.inserts += 1
+        return True
+
+    def _write_slot(self, offset: int, key: CacheKey, error: int, value: int) -> None:
+        # The counter stays odd if a writer died mid-write, start from odd anyway
+        seq = SEQ.unpack_from(self.map, offset)[0] | 1
+        SEQ.pack_into(self.map, offset, seq)
+        SLOT_BODY.pack_into(
+            self.map, offset + SEQ.size, key[0], key[2], key[1], SLOT_USED, error, value
+        )
+        SEQ.pack_into(self.map, offset, (seq + 1) & 0xFFFFFFFF)
+
+    def stats(self) -> Dict:
+        return {
+            "slots": self.slot_count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserts": self.inserts,
+            "evictions": self.evictions,
+            "retries": self.retries,
+        }
+
+    def close(self) -> None:
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+            os.close(self.fd)
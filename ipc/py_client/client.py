@@ -1,174 +1,139 @@
 #!/usr/bin/env python3
 
-import socket
-import time
-import logging
-import struct
-from ipc.common.protocol import Protocol, Message
 import sys
-from typing import Optional
 
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s | %(levelname)-5s | %(message)s"
-)
 
-SOCKET_NAME = "/tmp/math_chardev.socket"
-RETRY_LIMIT = 3
-RETRY_DELAY = 5  # seconds
-MAX_PAYLOAD_SIZE = 1024
-ERROR_MESSAGES = {
-    3: "Generic error message!",
-    22: "Generic error message!",  # EINVAL
-    34: "Result is too large",  # ERANGE
-    75: "Overflow or underflow error",  # EOVERFLOW
-}
+def run_oneshot(expressions):
+    """Runs client.py -c, defined before the imports of the client library."""
+    from ipc.py_client.oneshot import main as oneshot_main
 
+    sys.exit(oneshot_main(expressions))
 
-class Client:
-    def __init__(self, socket_path):
-        self.socket_path = socket_path
-        self.client_socket = None
-        self.is_connected = self.connect_to_server()
-        self.last_received_data = None
-
-    def connect_to_server(self):
-        for attempt in range(RETRY_LIMIT):
-            try:
-                self.client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-                logging.debug(f"Connecting to server at {self.socket_path}")
-                self.client_socket.connect(self.socket_path)
-                self.client_socket.settimeout(None)
-
-                # Wait for the service announcement message
-                if self.wait_for_service_announcement():
-                    logging.debug("Service announcement received.")
-                else:
-                    logging.error("Failed to receive service announcement.")
-                    return False
-
-                return True
-            except socket.error as e:
-                logging.error(f"Socket error: {e}")
-                if attempt < RETRY_LIMIT - 1:
-                    logging.info("Failed to connect. Retrying...")
-                    time.sleep(RETRY_DELAY)
-        logging.error("Failed to communicate with the server after several attempts.")
-        return False
-
-    def wait_for_service_announcement(self) -> bool:
-        """Wait for the server's service announcement and return True if received."""
-        received_data_type = self.process_message()
-        return received_data_type == Protocol.SERVICE_ANNOUNC_T
-
-    def send_and_receive(self, data_to_send: str) -> Optional[bool]:
-        """Send data to the server and return the result of the operation."""
-        if not self.is_connected:
-            logging.error("Not connected to the server.")
-            return None
-
-        if not self.send_msg(data_to_send):
-            return None
-
-        if not self.receive_ack():
-            return None
-
-        return self.receive_result()
-
-    def send_msg(self, data: str) -> bool:
-        """Send a message to the server and return True if the operation is successful."""
-        message = Message(Protocol.DATA_T, data)
-        data_message = Protocol.pack_message(message)
 
-        try:
-            self.client_socket.sendall(data_message)
-            return True
-        except Exception as e:
-            logging.error(f"Error sending message: {e}")
-            return False
+if __name__ == "__main__" and sys.argv[1:2] == ["-c"]:
+    # One-shot requests skip the imports of the client library below
+    run_oneshot(sys.argv[2:])
+
+import os
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from ipc.common.logging_setup import setup_logging
+from ipc.common.result_cache import ResultCache
+from ipc.py_client.connection import RETRY_DELAY, RETRY_LIMIT, ConnectionPool
+from ipc.py_client.errors import RequestError, ServerUnavailableError, error_for
+from typing import Iterable, Iterator, Optional, Union
+
+SERVER_SOCKET_ENV = "MATH_SERVER_SOCKET"
+SOCKET_NAME = os.environ.get(SERVER_SOCKET_ENV, "/tmp/math_chardev.socket")
+RESULT_CACHE_ENV = "MATH_RESULT_CACHE"  # Path of the shared result cache, optional
+DEFAULT_POOL_SIZE = 4
 
-    def send_msg(self, data):
-        message = Message(Protocol.DATA_T, data)
-        data_message = Protocol.pack_message(message)
+
+class Client:
+    """
+    Thread-safe client of the math server.
+
+    Requests go over a pool of up to pool_size connections. compute() blocks,
+    submit() and map() run the requests on pool_size worker threads. Results
+    are ints, refused requests raise a RequestError subclass matching the
+    error type sent by the server and connection failures raise
+    ServerUnavailableError.
+
+    Args:
+        socket_path (str): Path of the server socket.
+        pool_size (int): Maximum number of connections and worker threads.
+        timeout (float): Socket timeout in seconds, None blocks.
+        cache (ResultCache): Queried before the server, optional.
+        retries (int): Connection attempts before giving up.
+        retry_delay (float): Seconds between the connection attempts.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = SOCKET_NAME,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Optional[float] = None,
+        cache: Optional[ResultCache] = None,
+        retries: int = RETRY_LIMIT,
+        retry_delay: float = RETRY_DELAY,
+    ):
+        self.pool = ConnectionPool(socket_path, pool_size, timeout, retries, retry_delay)
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="math-client"
+        )
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def connect(self, count: int = 1) -> None:
+        """Opens count connections ahead of the first requests, raises ServerUnavailableError."""
+        self.pool.prefill(count)
+
+    def compute(self, expression: str) -> int:
+        """Returns the result of the expression, see the class docs for the errors."""
+        if self.cache is not None:
+            cached = self.cache.lookup(expression)
+            if cached is not None:
+                error, result = cached
+                if error:
+                    raise error_for(error)
+                return int(result)
 
         try:
-            self.client_socket.sendall(data_message)
-            return True
-        except Exception as e:
-            logging.error(f"Error sending message: {e}")
-            return False
-
-    def receive_ack(self) -> bool:
-        """Wait for an acknowledgment from the server and return True if received."""
-        received_data_type = self.process_message()
-        if received_data_type == Protocol.ACK_T:
-            logging.info("Request OKAY...")
-            return True
-        logging.error("Problem the request, ACK not received!")
-        return False
-
-    def receive_result(self) -> bool:
-        """Receive the result from the server, handle errors, and return if successful return True."""
-        logging.info("Receiving response...")
-        received_data_type = self.process_message()
-        if received_data_type == Protocol.DATA_T:
-            logging.info(f"Result received: {self.last_received_data}")
-            print(f"Result received: {self.last_received_data}")
-            return True
-        elif received_data_type in ERROR_MESSAGES:
-            error_message = ERROR_MESSAGES[received_data_type]
-            logging.error("Error message received.")
-            logging.error(f"Error message code: {received_data_type}")
-            logging.error(error_message)
-            return False
-        else:
-            logging.error("Result not received.")
-            return False
-
-    def process_message(self) -> Optional[int]:
-        """
-        Wait for a message from the server, unpack it, and process it according to its type.
-        Returns the message type, or None if no complete message is received.
+            result = self.pool.request(expression)
+        except RequestError as e:
+            if self.cache is not None:
+                self.cache.store(expression, e.errno, None)
+            raise
+        if self.cache is not None:
+            self.cache.store(expression, 0, str(result))
+        return result
+
+    def submit(self, expression: str) -> "Future[int]":
+        """Schedules the expression, the future holds its result or exception."""
+        return self.executor.submit(self.compute, expression)
+
+    def map(
+        self,
+        expressions: Iterable[str],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False,
+    ) -> Iterator[Union[int, RequestError]]:
         """
-        buffer_size = Protocol.HEADER_SIZE + MAX_PAYLOAD_SIZE + Protocol.CRC_SIZE
-        data = self.client_socket.recv(buffer_size)
-
-        # Check if the header is complete
-        if len(data) < Protocol.HEADER_SIZE:
-            logging.debug("Incomplete header received")
-            return None
-
-        while len(data) >= Protocol.HEADER_SIZE:
-            # Extract the header and determine the length of the message
-            header_data = data[: Protocol.HEADER_SIZE]
-            _, length = struct.unpack(Protocol.HEADER_FORMAT, header_data)
-
-            # Check if the entire message is received
-            if len(data) < Protocol.HEADER_SIZE + length:
-                logging.debug("Incomplete message received")
-                break
+        Computes the expressions concurrently and yields the results in order.
 
-            # Isolate the complete message and prepare the buffer for the next message
-            message_data = data[: Protocol.HEADER_SIZE + length]
-            data = data[Protocol.HEADER_SIZE + length :]
+        Like Executor.map() the first refused request raises, unless
+        return_exceptions is set: then its RequestError is yielded instead.
+        """
+        function = self._compute_or_error if return_exceptions else self.compute
+        return self.executor.map(function, expressions, timeout=timeout)
 
-            # Unpack and process the message
-            received_message = Protocol.unpack_message(message_data)
+    def _compute_or_error(self, expression: str) -> Union[int, RequestError]:
+        try:
+            return self.compute(expression)
+        except RequestError as e:
+            return e
 
-            # Handle the message according to its type
-            if received_message.type == Protocol.DATA_T:
-                self.last_received_data = received_message.payload
-            elif received_message.type == Protocol.SERVICE_ANNOUNC_T:
-                logging.debug(f"Service announcement: {received_message.payload}")
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.pool.close()
 
-            # Return the message type
-            return received_message.type
 
-        # If no complete message is received
-        logging.debug("No complete message received")
+def open_result_cache() -> Optional[ResultCache]:
+    """Open the result cache named by the MATH_RESULT_CACHE environment variable."""
+    path = os.environ.get(RESULT_CACHE_ENV)
+    if not path:
+        return None
+    try:
+        return ResultCache(path)
+    except OSError as e:
+        logging.error(f"Can't open the result cache {path}: {e}")
         return None
-
-    def received_data(self):
-        return self.last_received_data
 
 
 def read_input_output_list(filename):
@@ -177,98 +142,122 @@ def read_input_output_list(filename):
 
 
 def run_tests(test_cases_file):
+    cache = open_result_cache()
     try:
-        client = Client(SOCKET_NAME)
-        if not client.is_connected:
-            print("Failed to connect to the server.")
-            return
-
-        test_cases_list = read_input_output_list(test_cases_file)
-
-        for input_expr, expected_output in test_cases_list:
-            logging.info(f"Sending: {input_expr}")
-            client.send_and_receive(input_expr)
-            received_output = client.received_data()
-            if received_output == str(expected_output):
-                logging.info(
-                    f"Test passed for {input_expr}. Expected: {expected_output}, Received: {received_output}"
-                )
-            else:
-                logging.error(
-                    f"Test failed for {input_expr}. Expected: {expected_output}, Received: {received_output}"
-                )
-            time.sleep(1)
+        with Client(SOCKET_NAME, pool_size=1, cache=cache) as client:
+            client.connect()
+            test_cases_list = read_input_output_list(test_cases_file)
+
+            for input_expr, expected_output in test_cases_list:
+                logging.info(f"Sending: {input_expr}")
+                try:
+                    received_output = str(client.compute(input_expr))
+                except RequestError as e:
+                    logging.error(f"Error message received: {e}")
+                    received_output = None
+                if received_output == str(expected_output):
+                    logging.info(
+                        f"Test passed for {input_expr}. Expected: {expected_output}, Received: {received_output}"
+                    )
+                else:
+                    logging.error(
+                        f"Test failed for {input_expr}. Expected: {expected_output}, Received: {received_output}"
+                    )
+                time.sleep(1)
+    except ServerUnavailableError as e:
+        logging.error(f"{e}")
+        print("Failed to connect to the server.")
     except FileNotFoundError:
         logging.error("Test cases file not found.")
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
 
 
 def run_cli():
+    cache = open_result_cache()
     try:
-        client = Client(SOCKET_NAME)
-        if not client.is_connected:
-            print("Failed to connect to the server.")
-            return
+        with Client(SOCKET_NAME, pool_size=1, cache=cache) as client:
+            client.connect()
+            run_cli_loop(client)
+    except ServerUnavailableError as e:
+        logging.error(f"{e}")
+        print("Failed to connect to the server.")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        if cache is not None:
+            cache.close()
 
-        # Enter CLI event loop
-        while True:
-            print("(1) Add two numbers")
-            print("(2) Subtract two numbers")
-            print("(3) Divide two numbers")
-            print("(4) Multiply two numbers")
-            print("(5) Exit")
 
-            choice = input("Enter command (1-5): ")
+def run_cli_loop(client: Client):
+    while True:
+        print("(1) Add two numbers")
+        print("(2) Subtract two numbers")
+        print("(3) Divide two numbers")
+        print("(4) Multiply two numbers")
+        print("(5) Exit")
 
-            if choice == "5":
-                print("Exiting the program.")
-                break
+        choice = input("Enter command (1-5): ")
 
-            if choice not in ["1", "2", "3", "4"]:
-                print("Invalid option. Please try again.")
-                continue
+        if choice == "5":
+            print("Exiting the program.")
+            break
 
-            while True:
-                try:
-                    num1 = int(input("Enter operand 1: "))
-                    break
-                except ValueError:
-                    print("Invalid input. Please enter a number.")
+        if choice not in ["1", "2", "3", "4"]:
+            print("Invalid option. Please try again.")
+            continue
 
-            while True:
-                try:
-                    num2 = int(input("Enter operand 2: "))
-                    if choice == "3" and num2 == 0:
-                        print("Cannot divide by zero. Please enter a non-zero number.")
-                        continue
-                    break
-                except ValueError:
-                    print("Invalid input. Please enter a number.")
-
-            operation = ""
-            if choice == "1":
-                operation = "+"
-            elif choice == "2":
-                operation = "-"
-            elif choice == "3":
-                operation = "/"
-            elif choice == "4":
-                operation = "*"
-
-            expression = f"{num1}{operation}{num2}"
-            print(f"{expression=}")
-            client.send_and_receive(expression)
+        while True:
+            try:
+                num1 = int(input("Enter operand 1: "))
+                break
+            except ValueError:
+                print("Invalid input. Please enter a number.")
 
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        while True:
+            try:
+                num2 = int(input("Enter operand 2: "))
+                if choice == "3" and num2 == 0:
+                    print("Cannot divide by zero. Please enter a non-zero number.")
+                    continue
+                break
+            except ValueError:
+                print("Invalid input. Please enter a number.")
+
+        operation = ""
+        if choice == "1":
+            operation = "+"
+        elif choice == "2":
+            operation = "-"
+        elif choice == "3":
+            operation = "/"
+        elif choice == "4":
+            operation = "*"
+
+        expression = f"{num1}{operation}{num2}"
+        print(f"{expression=}")
+        try:
+            print(f"Result received: {client.compute(expression)}")
+        except RequestError as e:
+            print(f"Error received: {e}")
 
 
 def main():
     args = sys.argv[1:]
 
+    if args[:1] == ["-c"]:
+        run_oneshot(args[1:])
+
+    setup_logging()
     if not args:
         run_cli()
+    elif args == ["--daemon"]:
+        from ipc.py_client.daemon import run_daemon
+
+        run_daemon()
     else:
         # Run tests with file
         test_cases_file = sys.argv[1]
@@ -0,0 +1,217 @@
+import logging
+import select
+import socket
+import struct
+import threading
+import time
+from typing import List, Optional
+
+from ipc.common.protocol import Message, Protocol
+from ipc.py_client.errors import (
+    ProtocolError,
+    RequestError,
+    ServerUnavailableError,
+    error_for,
+)
+
+RETRY_LIMIT = 3
+RETRY_DELAY = 5  # seconds
+RECV_SIZE = 4096
+
+
+class Connection:
+    """
+    A connection to the server which completed the service announcement.
+
+    Not thread-safe, the ConnectionPool hands it to one thread at the time.
+    Bytes received past a message are kept for the next one, the server can
+    send the ACK and the result in a single segment.
+    """
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.buffer = bytearray()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path)
+            announcement = self.receive_message()
+        except OSError as e:
+            self.sock.close()
+            raise ServerUnavailableError(
+                f"Can't connect to the server at {socket_path}: {e}"
+            ) from e
+        except ServerUnavailableError:
+            self.sock.close()
+            raise
+
+        if announcement.type != Protocol.SERVICE_ANNOUNC_T:
+            self.sock.close()
+            raise ProtocolError("Service announcement not received")
+        logging.debug(f"Service announcement: {announcement.payload}")
+
+    def receive_message(self) -> Message:
+        """Receives exactly one message."""
+        buffer = self.buffer
+        while True:
+            if len(buffer) >= Protocol.HEADER_SIZE:
+                _, length = struct.unpack_from(Protocol.HEADER_FORMAT, buffer)
+                size = Protocol.HEADER_SIZE + length
+                if len(buffer) >= size:
+                    message_data = bytes(buffer[:size])
+                    del buffer[:size]
+                    return Protocol.unpack_message(message_data)
+
+            data = self.sock.recv(RECV_SIZE)
+            if not data:
+                raise ServerUnavailableError("Connection closed by the server")
+            buffer += data
+
+    def request(self, expression: str) -> int:
+        """
+        Sends an expression and waits for its result.
+
+        Raises:
+            RequestError: or a subclass, if the server refused the request
+            ServerUnavailableError: if the connection broke
+            ProtocolError: if the server answered with an unexpected message
+        """
+        try:
+            self.sock.sendall(
+                Protocol.pack_message(Message(Protocol.DATA_T, expression))
+            )
+            message = self.receive_message()
+            if message.type == Protocol.ACK_T:
+                message = self.receive_message()
+        except OSError as e:
+            raise ServerUnavailableError(f"Connection to the server broke: {e}") from e
+
+        if message.type == Protocol.DATA_T:
+            if not message.is_valid_crc():
+                raise ProtocolError("CRC mismatch of the result")
+            try:
+                return int(message.payload)
+            except ValueError:
+                raise ProtocolError(f"Invalid result: {message.payload!r}") from None
+        if message.type in (Protocol.ACK_T, Protocol.SERVICE_ANNOUNC_T):
+            raise ProtocolError(f"Unexpected message of type {message.type}")
+
+        # The error payload is "<error code>:<description>"
+        _, _, detail = message.payload.partition(":")
+        raise error_for(message.type, detail)
+
+    def is_healthy(self) -> bool:
+        """Returns False if the server closed the connection or sent unexpected data."""
+        if self.buffer:
+            return False
+        # poll() rather than select(), which refuses descriptors >= FD_SETSIZE
+        poller = select.poll()
+        try:
+            poller.register(self.sock, select.POLLIN)
+            events = poller.poll(0)
+        except (OSError, ValueError):
+            return False
+        # An idle connection has nothing to read, EOF or stray data make it unusable
+        return not events
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class ConnectionPool:
+    """
+    Up to size connections to the server, shared by any number of threads.
+
+    Connections are created on demand, checked for health when taken from
+    the pool and replaced when broken. A request which fails because its
+    connection broke is retried once on a new connection, the math requests
+    are idempotent.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        size: int,
+        timeout: Optional[float] = None,
+        retries: int = RETRY_LIMIT,
+        retry_delay: float = RETRY_DELAY,
+    ):
+        if size < 1:
+            raise ValueError("The pool size must be at least 1")
+        self.socket_path = socket_path
+        self.size = size
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()  # Guards idle and closed
+        self.idle: List[Connection] = []
+        self.closed = False
+
+    def connect(self) -> Connection:
+        """Opens a new connection, retrying with retry_delay between the attempts."""
+        for attempt in range(self.retries):
+            try:
+                return Connection(self.socket_path, self.timeout)
+            except ServerUnavailableError as e:
+                logging.error(f"{e}")
+                if attempt < self.retries - 1:
+                    logging.info("Failed to connect. Retrying...")
+                    time.sleep(self.retry_delay)
+        raise ServerUnavailableError(
+            "Failed to communicate with the server after several attempts."
+        )
+
+    def prefill(self, count: int = 1) -> None:
+        """Opens connections ahead of the first requests."""
+        for _ in range(min(count, self.size)):
+            with self.slots:
+                self._checkin(self.connect())
+
+    def _checkout(self) -> Connection:
+        with self.lock:
+            if self.closed:
+                raise ServerUnavailableError("The connection pool is closed")
+            while self.idle:
+                connection = self.idle.pop()
+                if connection.is_healthy():
+                    return connection
+                logging.info("Dropping a broken connection")
+                connection.close()
+        return self.connect()
+
+    def _checkin(self, connection: Connection) -> None:
+        with self.lock:
+            if not self.closed:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, expression: str) -> int:
+        """Sends the expression over a pooled connection, see Connection.request()."""
+        with self.slots:
+            for attempt in range(2):
+                connection = self._checkout()
+                try:
+                    result = connection.request(expression)
+                except RequestError:
+                    self._checkin(connection)
+                    raise
+                except ServerUnavailableError:
+                    connection.close()
+                    if attempt:
+                        raise
+                    logging.info("Connection broke, retrying on a new one")
+                    continue
+                except BaseException:
+                    connection.close()
+                    raise
+                self._checkin(connection)
+                return result
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
@@ -0,0 +1,127 @@
+import errno
+import logging
+import os
+import signal
+import socket
+import threading
+
+from ipc.py_client.client import (
+    DEFAULT_POOL_SIZE,
+    SOCKET_NAME,
+    Client,
+    open_result_cache,
+)
+from ipc.py_client.errors import ClientError, RequestError, ServerUnavailableError
+from ipc.py_client.oneshot import (
+    DAEMON_SOCKET_NAME,
+    UNAVAILABLE,
+    Reply,
+    format_reply,
+)
+
+
+def reply_for(client: Client, expression: str) -> Reply:
+    """Computes the expression, errors become their (code, message) reply."""
+    try:
+        return 0, str(client.compute(expression))
+    except RequestError as e:
+        return e.errno, str(e)
+    except ClientError as e:
+        return UNAVAILABLE, str(e)
+
+
+class ClientDaemon:
+    """
+    Answers one-shot command line requests over a warm Client.
+
+    The interpreter, the client imports and the server connections are paid
+    for once: a `client.py -c` invocation only connects to this unix socket,
+    see ipc.py_client.oneshot for the line protocol. Every connection is
+    served by its own thread, the Client bounds the server connections.
+    """
+
+    def __init__(self, client: Client, socket_path: str = DAEMON_SOCKET_NAME):
+        self.client = client
+        self.socket_path = socket_path
+        self.sock = None
+
+    def bind(self) -> None:
+        """Listens on socket_path, replacing the socket file of a dead daemon."""
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.unlink(self.socket_path)
+            else:
+                raise OSError(
+                    errno.EADDRINUSE,
+                    f"A client daemon already listens on {self.socket_path}",
+                )
+            finally:
+                probe.close()
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.socket_path)
+        self.sock.listen()
+        logging.info(f"Client daemon listening on {self.socket_path}")
+
+    def serve_forever(self) -> None:
+        if self.sock is None:
+            self.bind()
+        sock = self.sock
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                if self.sock is None:
+                    return  # Stopped by close()
+                raise
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn: socket.socket) -> None:
+        try:
+            with conn, conn.makefile("rb") as lines:
+                for line in lines:
+                    expression = line.decode(errors="replace").rstrip("\n")
+                    conn.sendall(format_reply(*reply_for(self.client, expression)))
+        except OSError as e:
+            logging.debug(f"Client daemon connection closed: {e}")
+
+    def close(self) -> None:
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)  # Wakes up a blocked accept()
+            except OSError:
+                pass
+            sock.close()
+            os.unlink(self.socket_path)
+        logging.info("Client daemon stopped")
+
+
+def run_daemon(pool_size: int = DEFAULT_POOL_SIZE) -> None:
+    """Serves one-shot requests until interrupted or terminated."""
+    # SIGTERM unwinds like Ctrl+C, so the socket file is removed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    cache = open_result_cache()
+    try:
+        # A single connection attempt per request like the one-shot mode, a
+        # request doesn't wait out RETRY_DELAY while the server is down
+        with Client(
+            SOCKET_NAME, pool_size=pool_size, cache=cache, retries=1
+        ) as client:
+            client.connect()
+            daemon = ClientDaemon(client)
+            try:
+                daemon.serve_forever()
+            finally:
+                daemon.close()
+    except ServerUnavailableError as e:
+        logging.error(f"{e}")
+        print("Failed to connect to the server.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
@@ -0,0 +1,64 @@
+import errno
+from typing import Dict, Type
+
+from ipc.common.protocol import Protocol
+
+
+class ClientError(Exception):
+    """Base class of every error raised by the Python client."""
+
+
+class ServerUnavailableError(ClientError):
+    """The server can't be reached or the connection broke."""
+
+
+class ProtocolError(ClientError):
+    """The server sent an unexpected or incomplete message."""
+
+
+class RequestError(ClientError):
+    """The server refused the request, errno holds the error type it sent."""
+
+    def __init__(self, code: int, message: str = ""):
+        super().__init__(message or f"Request failed with error {code}")
+        self.errno = code
+
+
+class InvalidOperationError(RequestError):
+    """EINVAL - unknown operator or too long input."""
+
+
+class MalformedExpressionError(RequestError):
+    """EDOM - the input is not two integer operands and an operator."""
+
+
+class OutOfRangeError(RequestError):
+    """ERANGE - an operand or the sum/difference doesn't fit in 32 bits."""
+
+
+class ResultOverflowError(RequestError):
+    """EOVERFLOW - the product/quotient overflows, INT_MIN / -1 or a division by zero."""
+
+
+ERRORS_BY_TYPE: Dict[int, Type[RequestError]] = {
+    errno.EINVAL: InvalidOperationError,
+    errno.EDOM: MalformedExpressionError,
+    errno.ERANGE: OutOfRangeError,
+    errno.EOVERFLOW: ResultOverflowError,
+}
+
+ERROR_MESSAGES = {
+    Protocol.ERROR_T: "Generic error message!",
+    errno.EINVAL: "Invalid operation",
+    errno.EDOM: "Invalid input, expected two integers and an operator",
+    errno.ERANGE: "Result is too large",
+    errno.EOVERFLOW: "Overflow or underflow error",
+}
+
+
+def error_for(code: int, detail: str = "") -> RequestError:
+    """Creates the exception matching an error type sent by the server."""
+    message = ERROR_MESSAGES.get(code, f"Error {code}")
+    if detail:
+        message = f"{message}: {detail}"
+    return ERRORS_BY_TYPE.get(code, RequestError)(code, message)
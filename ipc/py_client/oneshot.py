@@ -0,0 +1,100 @@
+"""
+One-shot requests from the command line: client.py -c EXPRESSION...
+
+Only socket is imported, so a request answered by a running client daemon
+(see ipc.py_client.daemon) costs little more than the interpreter startup.
+Without a daemon the expressions go straight to the server, which pays for
+the client imports and a new connection.
+
+The daemon reads newline separated expressions and answers each one with a
+"<code> <text>" line: code 0 with the result, or the error type sent by the
+server with its message.
+"""
+import os
+import socket
+import sys
+
+DAEMON_SOCKET_ENV = "MATH_CLIENT_DAEMON_SOCKET"
+DAEMON_SOCKET_NAME = os.environ.get(
+    DAEMON_SOCKET_ENV, "/tmp/math_chardev.client.socket"
+)
+DAEMON_TIMEOUT = 10.0  # seconds, a hung daemon doesn't block the caller forever
+UNAVAILABLE = -1  # Reply code when the server can't be reached
+
+# (code, text) - (0, result) or (error code, error message). The annotations
+# use the builtin generics, importing typing costs as much as socket.
+Reply = tuple[int, str]
+
+
+def format_reply(code: int, text: str) -> bytes:
+    return f"{code} {text}\n".encode()
+
+
+def parse_reply(line: bytes) -> Reply:
+    code, _, text = line.decode().rstrip("\n").partition(" ")
+    return int(code), text
+
+
+def query_daemon(
+    expressions: list[str],
+    socket_path: str = DAEMON_SOCKET_NAME,
+    timeout: float = DAEMON_TIMEOUT,
+) -> list[Reply] | None:
+    """Sends the expressions to the client daemon, returns None if none is running."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    replies = []
+    try:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return None
+        try:
+            data = "".join(f"{expression}\n" for expression in expressions).encode()
+            sock.sendall(data)
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as lines:
+                for line in lines:
+                    replies.append(parse_reply(line))
+        except OSError:
+            pass  # A hung or dead daemon, the missing replies are reported below
+    finally:
+        sock.close()
+
+    missing = len(expressions) - len(replies)
+    return replies + [(UNAVAILABLE, "No reply from the client daemon")] * missing
+
+
+def query_server(expressions: list[str]) -> list[Reply]:
+    """Sends the expressions straight to the server, the slow path without a daemon."""
+    from ipc.py_client.client import SOCKET_NAME, Client, open_result_cache
+    from ipc.py_client.daemon import reply_for
+
+    cache = open_result_cache()
+    try:
+        # A single connection attempt, a one-shot request doesn't wait out RETRY_DELAY
+        with Client(SOCKET_NAME, pool_size=1, cache=cache, retries=1) as client:
+            return [reply_for(client, expression) for expression in expressions]
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def main(expressions: list[str]) -> int:
+    """Prints the result of every expression, returns the exit status."""
+    if not expressions or any("\n" in expression for expression in expressions):
+        print("usage: client.py -c EXPRESSION...", file=sys.stderr)
+        return 2
+
+    replies = query_daemon(expressions, DAEMON_SOCKET_NAME)
+    if replies is None:
+        replies = query_server(expressions)
+
+    status = 0
+    for expression, (code, text) in zip(expressions, replies):
+        if code == 0:
+            print(text)
+        else:
+            print(f"{expression}: {text}", file=sys.stderr)
+            status = 1
+    return status
@@ -0,0 +1,192 @@
+import bisect
+import logging
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+from ipc.common.expression import COMPUTE_ERRNOS
+from ipc.server.backends import Backend, EvalResult
+
+# Dispatch strategies
+LEAST_OUTSTANDING = "least"
+CONSISTENT_HASH = "hash"
+STRATEGIES = (LEAST_OUTSTANDING, CONSISTENT_HASH)
+
+VIRTUAL_NODES = 64  # Points per backend on the hash ring
+HEALTH_RETRY_DELAY = 5  # seconds before an unhealthy backend is reopened
+
+
+class BackendUnavailable(Exception):
+    """Raised when no healthy backend can serve a request."""
+
+
+class BackendSlot:
+    """A backend together with its lock, health state and statistics."""
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        self.lock = threading.Lock()  # One request at the time per backend
+        self.healthy = True
+        self.retry_at = 0.0
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.busy_time = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.backend.name,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "busy_time": self.busy_time,
+            "backend": self.backend.stats(),
+        }
+
+
+class BackendPool:
+    """
+    Dispatches requests over several backends.
+
+    Requests go to the backend with the least outstanding work or to the one
+    owning the expression on a consistent hash ring. A backend which fails is
+    marked unhealthy, the request is retried on the next one and the failed
+    backend is reopened after HEALTH_RETRY_DELAY seconds.
+    """
+
+    def __init__(self, backends: Sequence[Backend], strategy: str = LEAST_OUTSTANDING):
+        if not backends:
+            raise ValueError("At least one backend is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown dispatch strategy: {strategy}")
+
+        self.slots = [BackendSlot(backend) for backend in backends]
+        self.strategy = strategy
+        self.lock = threading.Lock()  # Guards the slot state, not the backends
+        self.ring = sorted(
+            (zlib.crc32(f"{slot.backend.name}#{i}#{node}".encode()), i)
+            for i, slot in enumerate(self.slots)
+            for node in range(VIRTUAL_NODES)
+        )
+        self.ring_keys = [key for key, _ in self.ring]
+
+    def open(self) -> None:
+        """Opens every backend, the ones which fail start as unhealthy."""
+        for slot in self.slots:
+            with slot.lock:
+                opened = slot.backend.open()
+            with self.lock:
+                if opened:
+                    slot.healthy = True
+                else:
+                    self._mark_unhealthy(slot)
+
+    def close(self) -> None:
+        for slot in self.slots:
+            with slot.lock:
+                slot.backend.close()
+
+    def shutdown(self) -> None:
+        for slot in self.slots:
+            with slot.lock:
+                slot.backend.shutdown()
+        logging.info(f"Backend statistics: {self.stats()}")
+
+    def stats(self) -> List[Dict]:
+        with self.lock:
+            return [slot.stats() for slot in self.slots]
+
+    def execute(self, expression: str) -> EvalResult:
+        """
+        Evaluates the expression on a healthy backend.
+
+        Returns:
+            EvalResult: (0, result) on success, otherwise the compute errno and None
+
+        Raises:
+            BackendUnavailable: if every backend failed or is unhealthy
+        """
+        tried = set()
+        while True:
+            slot = self._acquire(expression, tried)
+            if slot is None:
+                raise BackendUnavailable("No healthy backend available")
+            tried.add(id(slot))
+
+            start = time.perf_counter()
+            try:
+                with slot.lock:
+                    result = slot.backend.evaluate(expression)
+            except Exception as e:
+                logging.error(f"Backend {slot.backend.name} raised: {e}")
+                result = (None, None)
+            elapsed = time.perf_counter() - start
+
+            failed = result[0] != 0 and result[0] not in COMPUTE_ERRNOS
+            with self.lock:
+                slot.outstanding -= 1
+                slot.requests += 1
+                slot.busy_time += elapsed
+                if failed:
+                    slot.failures += 1
+                    self._mark_unhealthy(slot)
+
+            if not failed:
+                return result
+            logging.error(
+                f"Backend {slot.backend.name} failed with {result[0]}, rerouting"
+            )
+
+    def _mark_unhealthy(self, slot: BackendSlot) -> None:
+        if slot.healthy:
+            logging.error(f"Backend {slot.backend.name} marked unhealthy")
+        slot.healthy = False
+        slot.retry_at = time.monotonic() + HEALTH_RETRY_DELAY
+
+    def _revive(self) -> None:
+        """Reopens the unhealthy backends whose retry delay has passed."""
+        now = time.monotonic()
+        with self.lock:
+            due = [s for s in self.slots if not s.healthy and s.retry_at <= now]
+            for slot in due:
+                slot.retry_at = now + HEALTH_RETRY_DELAY
+
+        for slot in due:
+            with slot.lock:
+                slot.backend.close()
+                opened = slot.backend.open()
+            if opened:
+                with self.lock:
+                    slot.healthy = True
+                logging.info(f"Backend {slot.backend.name} is healthy again")
+
+    def _acquire(self, expression: str, tried: set) -> Optional[BackendSlot]:
+        """Selects a slot and reserves it by increasing its outstanding work."""
+        self._revive()
+        with self.lock:
+            if self.strategy == CONSISTENT_HASH:
+                slot = self._select_hashed(expression, tried)
+            else:
+                slot = self._select_least_outstanding(tried)
+            if slot is not None:
+                slot.outstanding += 1
+            return slot
+
+    def _select_least_outstanding(self, tried: set) -> Optional[BackendSlot]:
+        candidates = [
+            s for s in self.slots if s.healthy and id(s) not in tried
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: s.outstanding)
+
+    def _select_hashed(self, expression: str, tried: set) -> Optional[BackendSlot]:
+        start = bisect.bisect(self.ring_keys, zlib.crc32(expression.encode()))
+        for offset in range(len(self.ring)):
+            _, index = self.ring[(start + offset) % len(self.ring)]
+            slot = self.slots[index]
+            if slot.healthy and id(slot) not in tried:
+                return slot
+        return None
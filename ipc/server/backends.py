@@ -0,0 +1,258 @@
+import errno
+import logging
+import signal
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple
+
+from ipc.common.expression import (
+    MAX_EXPRESSION_SIZE,
+    S32_MAX,
+    S32_MIN,
+    parse_expression,
+)
+from ipc.server.device_manager import DeviceManager
+
+# (errno, result) - errno is 0 on success, result is None on failure
+EvalResult = Tuple[int, Optional[str]]
+
+
+def evaluate_expression(expression: str) -> EvalResult:
+    """
+    Evaluates an expression with the same rules and errno values as the chardev.
+
+    Args:
+        expression (str): Two 32-bit signed integer operands and an operator.
+
+    Returns:
+        EvalResult: (0, result) on success, otherwise (errno, None)
+    """
+    if len(expression.encode("utf-8")) >= MAX_EXPRESSION_SIZE:
+        return errno.EINVAL, None
+
+    parsed = parse_expression(expression)
+    # The chardev refuses parentheses anywhere, also as the operator
+    if parsed is None or "(" in expression or ")" in expression:
+        return errno.EDOM, None
+
+    operand1, operator, operand2 = parsed
+    if not (S32_MIN <= operand1 <= S32_MAX and S32_MIN <= operand2 <= S32_MAX):
+        return errno.ERANGE, None
+
+    if operator == "+":
+        result = operand1 + operand2
+        overflow_errno = errno.ERANGE
+    elif operator == "-":
+        result = operand1 - operand2
+        overflow_errno = errno.ERANGE
+    elif operator == "*":
+        result = operand1 * operand2
+        overflow_errno = errno.EOVERFLOW
+    elif operator == "/":
+        if operand2 == 0:
+            return errno.EOVERFLOW, None
+        # C division truncates towards zero
+        result = abs(operand1) // abs(operand2)
+        if (operand1 < 0) != (operand2 < 0):
+            result = -result
+        overflow_errno = errno.EOVERFLOW
+    else:
+        return errno.EINVAL, None
+
+    if not S32_MIN <= result <= S32_MAX:
+        return overflow_errno, None
+    return 0, str(result)
+
+
+class Backend(ABC):
+    """
+    Base class of everything the server can dispatch a computation to.
+
+    Implementations are not required to be thread-safe, the BackendPool
+    serializes the calls to a single backend.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def open(self) -> bool:
+        """Acquires the backend resources, returns True if it is ready for use."""
+        return True
+
+    def close(self) -> None:
+        """Releases the resources acquired by open()."""
+
+    def shutdown(self) -> None:
+        """Releases everything the backend owns, called once on server shutdown."""
+        self.close()
+
+    @abstractmethod
+    def evaluate(self, expression: str) -> EvalResult:
+        """Computes the expression, returns (0, result) or (errno, None)."""
+
+    def stats(self) -> Dict:
+        """Backend specific statistics, included in the BackendPool statistics."""
+        return {}
+
+
+class DeviceBackend(Backend):
+    """Backend which owns a handle to a math chardev node."""
+
+    def __init__(self, device_path: str):
+        super().__init__(device_path)
+        self.device_manager = DeviceManager(device_path)
+
+    def open(self) -> bool:
+        self.device_manager.open_device()
+        return self.device_manager.is_open
+
+    def close(self) -> None:
+        self.device_manager.close_device()
+
+    def evaluate(self, expression: str) -> EvalResult:
+        write_result = self.device_manager.write_to_device(expression)
+        if write_result is None:
+            return errno.ENODEV, None
+        if write_result != 0:
+            return write_result, None
+
+        result = self.device_manager.read_result()
+        if result is None:
+            return errno.EIO, None
+        return 0, str(result)
+
+    def stats(self) -> Dict:
+        return self.device_manager.stats()
+
+
+class EvaluatorBackend(Backend):
+    """Userspace backend, computes in the server process without a device."""
+
+    def __init__(self, name: str = "evaluator"):
+        super().__init__(name)
+
+    def evaluate(self, expression: str) -> EvalResult:
+        return evaluate_expression(expression)
+
+
+def _backend_worker(conn, backend_factory: Callable[[], Backend]) -> None:
+    """Serves the requests of a ProcessBackend inside the child process."""
+    # The parent owns the shutdown, don't run the inherited server handlers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    backend = backend_factory()
+    try:
+        while True:
+            try:
+                command, argument = conn.recv()
+            except EOFError:
+                break
+
+            if command == "eval":
+                conn.send(backend.evaluate(argument))
+            elif command == "open":
+                conn.send(backend.open())
+            elif command == "close":
+                backend.close()
+                conn.send(None)
+            elif command == "stats":
+                conn.send(backend.stats())
+            elif command == "stop":
+                break
+    finally:
+        backend.shutdown()
+        conn.close()
+
+
+class ProcessBackend(Backend):
+    """
+    Runs another backend in a dedicated child process.
+
+    The child owns its handle, so a device node or an evaluator can be scaled
+    past a single interpreter. The factory must be picklable, for example
+    functools.partial(DeviceBackend, "/dev/math_chardev").
+
+    stats() asks the child for the statistics of its backend, the last ones
+    received are kept for the shutdown summary.
+    """
+
+    def __init__(self, backend_factory: Callable[[], Backend], name: str = "process"):
+        super().__init__(name)
+        self.backend_factory = backend_factory
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()  # stats() may run next to a request
+        self.last_stats: Dict = {}
+
+    def start(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            return
+        if self.conn is not None:
+            self.conn.close()
+        # Imported on first use, it is the largest import of the server
+        import multiprocessing
+
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_backend_worker,
+            args=(child_conn, self.backend_factory),
+            name=f"backend-{self.name}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        logging.info(f"Backend process {self.name} started, pid {self.process.pid}")
+
+    def _request(self, command: str, argument=None):
+        with self.lock:
+            self.conn.send((command, argument))
+            return self.conn.recv()
+
+    def open(self) -> bool:
+        try:
+            self.start()
+            return self._request("open")
+        except (OSError, EOFError) as e:
+            logging.error(f"Backend process {self.name} failed to open: {e}")
+            return False
+
+    def close(self) -> None:
+        if self.process is None or not self.process.is_alive():
+            return
+        try:
+            self._request("close")
+        except (OSError, EOFError) as e:
+            logging.error(f"Backend process {self.name} failed to close: {e}")
+
+    def shutdown(self) -> None:
+        if self.process is None:
+            return
+        self.stats()
+        try:
+            self.conn.send(("stop", None))
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def evaluate(self, expression: str) -> EvalResult:
+        if self.conn is None:
+            return errno.ENODEV, None
+        try:
+            return self._request("eval", expression)
+        except (OSError, EOFError) as e:
+            logging.error(f"Backend process {self.name} is not responding: {e}")
+            return errno.EPIPE, None
+
+    def stats(self) -> Dict:
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.last_stats = self._request("stats")
+            except (OSError, EOFError) as e:
+                logging.error(f"Backend process {self.name} failed to send stats: {e}")
+        return self.last_stats
@@ -1,11 +1,27 @@
+import argparse
+from functools import partial
 import socket
 import os
 import threading
 import signal
 import struct
 import logging
+from typing import Optional, Sequence
+from ipc.common.logging_setup import setup_logging
 from ipc.common.protocol import Protocol, Message
-from ipc.server.device_manager import DeviceManager
+from ipc.common.result_cache import DEFAULT_SLOTS, ResultCache
+from ipc.server.backends import (
+    Backend,
+    DeviceBackend,
+    EvaluatorBackend,
+    ProcessBackend,
+)
+from ipc.server.backend_pool import (
+    BackendPool,
+    BackendUnavailable,
+    LEAST_OUTSTANDING,
+    STRATEGIES,
+)
 
 # Server configuration
 SOCKET_NAME = "/tmp/math_chardev.socket"
@@ -13,21 +29,21 @@ DEVICE_PATH = "/dev/math_chardev"
 MAX_QUEDUED_CONNS = 5
 CLIENT_TIMEOUT = 1800  # seconds
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s | %(levelname)-5s | %(threadName)s | %(message)s",
-)
-
 
 class Server:
-    def __init__(self, socket_path):
+    def __init__(
+        self,
+        socket_path,
+        backends: Optional[Sequence[Backend]] = None,
+        strategy: str = LEAST_OUTSTANDING,
+        cache: Optional[ResultCache] = None,
+    ):
         self.socket_path = socket_path
         self.active_connections = 0  # Track the number of active clients
-        self.device_lock = (
-            threading.Lock()
-        )  # To ensure 1 client thread at the time can access the driver
-        self.DevManager = DeviceManager(DEVICE_PATH)
+        self.connections_lock = threading.Lock()
+        # The pool serializes the access to each backend separately
+        self.backends = BackendPool(backends or [DeviceBackend(DEVICE_PATH)], strategy)
+        self.cache = cache  # Queried before the backends
         self.is_shutting_down = False  #
         self.setup_socket()
 
@@ -48,12 +64,13 @@ class Server:
 
     def handle_client(self, conn: socket.socket):
         """Handle an individual client connection."""
-        with self.device_lock:
+        with self.connections_lock:
             self.active_connections += 1
+            if self.active_connections == 1:
+                self.backends.open()
 
         logging.info("Client connected")
         self.send_service_announcement(conn)
-        self.DevManager.open_device()
 
         try:
             while True:
@@ -62,9 +79,9 @@ class Server:
                     break
 
                 logging.info(f"Processing request: {message.payload}")
-                with self.device_lock:
-                    if self.process_client_request(conn, message):
-                        self.transmit_data_response(conn)
+                data = self.process_client_request(conn, message)
+                if data is not None:
+                    self.transmit_data_response(conn, data)
 
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
@@ -102,41 +119,58 @@ class Server:
         Args:
             conn (socket.socket): The client connection socket that is being closed.
         """
-        with self.device_lock:
+        with self.connections_lock:
             self.active_connections -= 1
             if self.active_connections == 0:
-                logging.info("No active connections, closing the chardev.")
-                self.DevManager.close_device()
+                logging.info("No active connections, closing the backends.")
+                self.backends.close()
         conn.close()
 
     def send_service_announcement(self, conn: socket.socket) -> None:
         """Sends a service announcement message over the given connection."""
-        service_message = Protocol.create_service_announcement()
-        packed_service_message = Protocol.pack_message(service_message)
-        self.send_msg(conn, packed_service_message)
+        self.send_msg(conn, Protocol.packed_service_announcement())
 
-    def process_client_request(self, conn: socket.socket, message: Message) -> bool:
+    def process_client_request(
+        self, conn: socket.socket, message: Message
+    ) -> Optional[str]:
         """
-        Processes a client request, writing data to the device and handling responses.
+        Processes a client request, dispatching it to a backend and handling responses.
 
         Args:
             conn (socket.socket): The client connection socket.
             message (Message): The message from the client.
 
         Returns:
-            bool: True if the request was successfully processed, otherwise False
+            Optional[str]: The result if the request was successfully processed, otherwise None
         """
-        if message.is_valid_crc():
-            write_result = self.DevManager.write_to_device(message.payload)
-            self.transmit_ack(conn)
-            # Transmit data range error
-            if write_result != 0:
-                self.transmit_error(conn, write_result)
-                return False
-            return True
-        else:
+        if not message.is_valid_crc():
             self.transmit_error(conn)
-            return False
+            return None
+
+        cached = self.cache.lookup(message.payload) if self.cache else None
+        if cached is not None:
+            write_result, data = cached
+        else:
+            try:
+                write_result, data = self.backends.execute(message.payload)
+            except BackendUnavailable as e:
+                logging.error(f"{e}")
+                self.transmit_ack(conn)
+                self.transmit_error(
+                    conn,
+                    error_code=Protocol.ERROR_T,
+                    error_message="Backend unavailable",
+                )
+                return None
+            if self.cache:
+                self.cache.store(message.payload, write_result, data)
+
+        self.transmit_ack(conn)
+        # Transmit data range error
+        if write_result != 0:
+            self.transmit_error(conn, write_result)
+            return None
+        return data
 
     def send_msg(self, conn: socket.socket, message: bytes) -> bool:
         """
@@ -185,16 +219,8 @@ class Server:
         else:
             logging.error(f"Failed to send ERROR type {error_code}")
 
-    def transmit_data_response(self, conn):
+    def transmit_data_response(self, conn, data: str):
         """Sends a data response to the client"""
-        data = self.DevManager.read_from_device()
-        if data is None:
-            logging.error("Failed to read data from device.")
-            self.transmit_error(
-                conn, error_code=Protocol.ERROR_T, error_message="Read failure"
-            )
-            return
-
         logging.info(f"Sending result: {data}")
         data_message = Protocol.pack_message(Message(Protocol.DATA_T, data))
 
@@ -210,9 +236,11 @@ class Server:
             return
         self.is_shutting_down = True
         logging.info("Shutting down the server...")
-        with self.device_lock:
-            if self.active_connections > 0:
-                self.DevManager.close_device()
+        with self.connections_lock:
+            self.backends.shutdown()
+        if self.cache:
+            logging.info(f"Result cache statistics: {self.cache.stats()}")
+            self.cache.close()
         self.server_socket.close()
 
     def signal_handler(self, signum, frame):
@@ -245,6 +273,68 @@ class Server:
             self.shutdown_server()  # TODO connection hangs out
 
 
+def build_backends(args) -> list:
+    """Creates the backends described by the command line arguments."""
+    devices = args.device or ([] if args.evaluators else [DEVICE_PATH])
+    factories = [partial(DeviceBackend, path) for path in devices]
+    factories += [
+        partial(EvaluatorBackend, f"evaluator-{i}") for i in range(args.evaluators)
+    ]
+    if args.processes:
+        return [
+            ProcessBackend(factory, name=f"process-{i}")
+            for i, factory in enumerate(factories)
+        ]
+    return [factory() for factory in factories]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Math chardev gateway server")
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_NAME,
+        help=f"Path of the server socket (default: {SOCKET_NAME})",
+    )
+    parser.add_argument(
+        "--device",
+        action="append",
+        default=[],
+        help=f"Chardev node backend, repeatable (default: {DEVICE_PATH})",
+    )
+    parser.add_argument(
+        "--evaluators",
+        type=int,
+        default=0,
+        help="Number of userspace evaluator backends",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="Run every backend in a dedicated process",
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=STRATEGIES,
+        default=LEAST_OUTSTANDING,
+        help="Dispatch by least outstanding work or by consistent hashing",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="Result cache file shared with other servers and clients",
+    )
+    parser.add_argument(
+        "--cache-slots",
+        type=int,
+        default=DEFAULT_SLOTS,
+        help="Number of slots of a newly created result cache",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    server = Server(SOCKET_NAME)
+    args = parse_args()
+    setup_logging()
+    cache = ResultCache(args.cache, args.cache_slots) if args.cache else None
+    server = Server(args.socket, build_backends(args), args.strategy, cache)
     server.run()
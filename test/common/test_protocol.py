@@ -0,0 +1,33 @@
+"""
+This module tests the message framing shared by the client and the server.
+"""
+import subprocess
+import sys
+
+from ipc.common.protocol import Protocol
+
+
+def test_pack_and_unpack():
+    packed = Protocol.pack_message(Protocol.create_message(Protocol.DATA_T, "3 + 4"))
+    message = Protocol.unpack_message(packed)
+
+    assert message.type == Protocol.DATA_T
+    assert message.payload == "3 + 4"
+    assert message.is_valid_crc()
+
+
+def test_packed_service_announcement():
+    packed = Protocol.packed_service_announcement()
+
+    assert packed == Protocol.pack_message(Protocol.create_service_announcement())
+    assert Protocol.packed_service_announcement() is packed
+
+
+def test_import_has_no_side_effects():
+    code = (
+        "import logging, ipc.common.protocol\n"
+        "assert not logging.getLogger().handlers\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == result.stderr == b""
@@ -0,0 +1,135 @@
+"""
+This module tests the mmap'd result cache shared by the client and the server.
+"""
+import errno
+import multiprocessing
+import os
+import struct
+
+import pytest
+
+from ipc.common.result_cache import (
+    HEADER_FORMAT,
+    HEADER_SIZE,
+    MAGIC,
+    SEQ,
+    SLOT,
+    ResultCache,
+    make_key,
+)
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), slots=64)
+
+    assert cache.lookup("3 + 4") is None
+    assert cache.store("3 + 4", 0, "7")
+    assert cache.store("10 / 0", errno.EOVERFLOW, None)
+
+    assert cache.lookup("3 + 4") == (0, "7")
+    assert cache.lookup("3+4") == (0, "7")  # Same key as the chardev parses it
+    assert cache.lookup("10 / 0") == (errno.EOVERFLOW, None)
+    assert cache.stats()["hits"] == 3
+    cache.close()
+
+
+def test_uncacheable(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), slots=64)
+
+    assert make_key("a + b") is None
+    assert make_key("9999999999 + 1") is None
+    assert make_key("5 + +3") is None  # The chardev refuses a "+" sign
+    assert make_key("1(2") is None
+    assert not cache.store("3 + 4", errno.EIO, None)  # Backend failure
+    assert cache.lookup("3 + 4") is None
+    cache.close()
+
+
+def test_non_ascii_operator(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), slots=64)
+
+    # U+2212 minus doesn't parse, the chardev reads only its first byte
+    assert make_key("3 \u2212 4") is None
+    assert cache.lookup("3 \u2212 4") is None
+    assert not cache.store("3 \u2212 4", errno.EINVAL, None)
+    cache.close()
+
+
+def test_survives_restart(tmp_path):
+    path = str(tmp_path / "results")
+    cache = ResultCache(path, slots=64)
+    cache.store("-5 * 3", 0, "-15")
+    cache.close()
+
+    # The slot count is taken from the existing file
+    cache = ResultCache(path, slots=1024)
+    assert cache.slot_count == 64
+    assert cache.lookup("-5 * 3") == (0, "-15")
+    cache.close()
+
+
+def test_stale_odd_counter(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), slots=64)
+    cache.store("3 + 4", 0, "7")
+    offset = next(
+        offset
+        for offset in cache._probe(make_key("3 + 4"))
+        if SLOT.unpack_from(cache.map, offset)[1:3] == (3, 4)
+    )
+    # A writer killed between the two counter updates leaves it odd
+    SEQ.pack_into(cache.map, offset, 3)
+    assert cache.lookup("3 + 4") is None
+
+    assert cache.store("3 + 4", 0, "7")
+    assert SEQ.unpack_from(cache.map, offset)[0] % 2 == 0
+    assert cache.lookup("3 + 4") == (0, "7")
+    cache.close()
+
+
+def test_invalid_slot_count(tmp_path):
+    with pytest.raises(ValueError):
+        ResultCache(str(tmp_path / "results"), slots=0)
+
+    path = tmp_path / "empty_table"
+    header = struct.pack(HEADER_FORMAT, MAGIC, 0, SLOT.size)
+    path.write_bytes(header.ljust(HEADER_SIZE, b"\0"))
+    with pytest.raises(ValueError):
+        ResultCache(str(path))
+
+
+def test_not_shared_with_other_users(tmp_path):
+    path = str(tmp_path / "results")
+    ResultCache(path, slots=64).close()
+
+    assert os.stat(path).st_mode & 0o007 == 0
+
+
+def test_eviction_keeps_results_correct(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), slots=16)
+
+    for i in range(200):
+        cache.store(f"{i} + 1", 0, str(i + 1))
+
+    assert cache.stats()["evictions"] > 0
+    for i in range(200):
+        cached = cache.lookup(f"{i} + 1")
+        assert cached is None or cached == (0, str(i + 1))
+    cache.close()
+
+
+def _store_in_child(path):
+    cache = ResultCache(path)
+    cache.store("6 * 7", 0, "42")
+    cache.close()
+
+
+def test_shared_between_processes(tmp_path):
+    path = str(tmp_path / "results")
+    cache = ResultCache(path, slots=64)
+
+    process = multiprocessing.Process(target=_store_in_child, args=(path,))
+    process.start()
+    process.join()
+
+    assert cache.lookup("6 * 7") == (0, "42")
+    cache.close()
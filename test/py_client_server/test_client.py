@@ -0,0 +1,259 @@
+"""
+This module tests the pooled Python client and the one-shot client daemon
+against a server running userspace evaluator backends in a child process.
+"""
+import errno
+import logging
+import multiprocessing
+import os
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from ipc.common.result_cache import ResultCache
+from ipc.py_client import client as client_module, connection, oneshot
+from ipc.py_client.client import Client
+from ipc.py_client.daemon import ClientDaemon
+from ipc.py_client.errors import (
+    InvalidOperationError,
+    MalformedExpressionError,
+    OutOfRangeError,
+    RequestError,
+    ResultOverflowError,
+    ServerUnavailableError,
+)
+from ipc.server.backends import EvaluatorBackend
+from ipc.server.server import Server
+
+
+def serve(socket_path):
+    logging.disable(logging.CRITICAL)
+    Server(socket_path, [EvaluatorBackend(f"evaluator-{i}") for i in range(2)]).run()
+
+
+def start_server(socket_path):
+    process = multiprocessing.Process(target=serve, args=(socket_path,), daemon=True)
+    process.start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.05)
+    return process
+
+
+def stop_server(process):
+    process.terminate()
+    process.join(2)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "math_chardev.socket")
+    process = start_server(path)
+    yield path
+    stop_server(process)
+
+
+def test_compute(socket_path):
+    with Client(socket_path, pool_size=2) as client:
+        assert client.compute("3 + 4") == 7
+        assert client.compute("-7 / 2") == -3
+
+
+@pytest.mark.parametrize(
+    "expression, error",
+    [
+        ("10 / 0", ResultOverflowError),
+        ("a + b", MalformedExpressionError),
+        ("2147483647 + 1", OutOfRangeError),
+        ("1 % 2", InvalidOperationError),
+    ],
+)
+def test_typed_errors(socket_path, expression, error):
+    with Client(socket_path, pool_size=1) as client:
+        with pytest.raises(error):
+            client.compute(expression)
+        # The connection stays usable after a refused request
+        assert client.compute("1 + 1") == 2
+
+
+def test_submit_and_map(socket_path):
+    with Client(socket_path, pool_size=4) as client:
+        future = client.submit("6 * 7")
+        assert future.result() == 42
+
+        expressions = [f"{i} * 2" for i in range(100)]
+        assert list(client.map(expressions)) == [i * 2 for i in range(100)]
+
+        results = list(client.map(["1 + 1", "1 / 0"], return_exceptions=True))
+        assert results[0] == 2
+        assert isinstance(results[1], RequestError)
+
+
+def test_pool_size_bounds_connections(socket_path, monkeypatch):
+    lock = threading.Lock()
+    live = {"now": 0, "max": 0}
+
+    class CountingConnection(connection.Connection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            with lock:
+                live["now"] += 1
+                live["max"] = max(live["max"], live["now"])
+
+        def close(self):
+            with lock:
+                live["now"] -= 1
+            super().close()
+
+    monkeypatch.setattr(connection, "Connection", CountingConnection)
+    with Client(socket_path, pool_size=3) as client:
+
+        def worker():
+            for i in range(20):
+                assert client.compute(f"{i} + 1") == i + 1
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # Connections open at the same time, counting the ones dropped as broken
+    assert 1 <= live["max"] <= 3
+    assert live["now"] == 0
+
+
+def test_pool_reuses_connections_above_fd_setsize(socket_path):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and hard < 1100:
+        pytest.skip("The descriptor limit is below 1100")
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, 1100), hard))
+    # Fill the low descriptors so the connection gets one above 1024
+    fds = [os.open(os.devnull, os.O_RDONLY) for _ in range(1030)]
+    try:
+        with Client(socket_path, pool_size=1) as client:
+            client.connect()
+            connection = client.pool.idle[0]
+            assert connection.sock.fileno() >= 1024
+            for i in range(20):
+                assert client.compute(f"{i} + 1") == i + 1
+            assert client.pool.idle == [connection]
+    finally:
+        for fd in fds:
+            os.close(fd)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def test_reconnect_after_server_restart(tmp_path):
+    path = str(tmp_path / "math_chardev.socket")
+    process = start_server(path)
+    with Client(path, pool_size=1, retry_delay=0.1) as client:
+        assert client.compute("1 + 2") == 3
+
+        stop_server(process)
+        process = start_server(path)
+        assert client.compute("2 + 2") == 4
+    stop_server(process)
+
+
+def test_server_unavailable(tmp_path):
+    with Client(str(tmp_path / "missing.socket"), retries=1) as client:
+        with pytest.raises(ServerUnavailableError):
+            client.compute("1 + 2")
+
+
+def test_cache_answers_without_server(tmp_path):
+    cache = ResultCache(str(tmp_path / "results"), slots=64)
+    cache.store("3 + 4", 0, "7")
+    cache.store("10 / 0", 75, None)
+    with Client(str(tmp_path / "missing.socket"), retries=1, cache=cache) as client:
+        assert client.compute("3 + 4") == 7
+        with pytest.raises(ResultOverflowError):
+            client.compute("10 / 0")
+    cache.close()
+
+
+def test_daemon_answers_oneshot_requests(socket_path, tmp_path):
+    daemon_path = str(tmp_path / "client.socket")
+    with Client(socket_path, pool_size=2) as client:
+        daemon = ClientDaemon(client, daemon_path)
+        daemon.bind()
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+
+        replies = oneshot.query_daemon(["1 + 2", "10 / 0", "a + b"], daemon_path)
+        assert replies[0] == (0, "3")
+        assert replies[1][0] == errno.EOVERFLOW
+        assert replies[2][0] == errno.EDOM
+
+        # A second daemon doesn't take over the socket of a running one
+        with pytest.raises(OSError):
+            ClientDaemon(client, daemon_path).bind()
+        daemon.close()
+
+    assert oneshot.query_daemon(["1 + 2"], daemon_path) is None
+
+
+def test_oneshot_without_daemon(socket_path, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(oneshot, "DAEMON_SOCKET_NAME", str(tmp_path / "missing"))
+    monkeypatch.setattr(client_module, "SOCKET_NAME", socket_path)
+
+    assert oneshot.main(["6 * 7"]) == 0
+    assert capsys.readouterr().out == "42\n"
+    assert oneshot.main(["6 * 7", "1 / 0"]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == "42\n"
+    assert captured.err.startswith("1 / 0: ")
+
+
+def test_hung_daemon_times_out(tmp_path):
+    daemon_path = str(tmp_path / "client.socket")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(daemon_path)
+    listener.listen()  # Never answers
+
+    start = time.monotonic()
+    replies = oneshot.query_daemon(["1 + 2"], daemon_path, timeout=0.2)
+    assert replies[0][0] == oneshot.UNAVAILABLE
+    assert time.monotonic() - start < 2
+    listener.close()
+
+
+def test_daemon_fails_fast_without_server(tmp_path):
+    socket_path = str(tmp_path / "math_chardev.socket")
+    daemon_path = str(tmp_path / "client.socket")
+    env = dict(os.environ)
+    env[client_module.SERVER_SOCKET_ENV] = socket_path
+    env[oneshot.DAEMON_SOCKET_ENV] = daemon_path
+    server = start_server(socket_path)
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "ipc.py_client.client", "--daemon"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            if os.path.exists(daemon_path):
+                break
+            time.sleep(0.05)
+        assert oneshot.query_daemon(["1 + 2"], daemon_path) == [(0, "3")]
+
+        stop_server(server)
+        start = time.monotonic()
+        replies = oneshot.query_daemon(["1 + 2"], daemon_path)
+        # No RETRY_DELAY sleeps between the connection attempts
+        assert replies[0][0] == oneshot.UNAVAILABLE
+        assert time.monotonic() - start < 2
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        stop_server(server)
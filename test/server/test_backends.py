@@ -0,0 +1,120 @@
+"""
+This module tests the userspace evaluator against the chardev semantics
+and the dispatching of the backend pool.
+"""
+import errno
+from functools import partial
+
+import pytest
+
+from ipc.server.backends import (
+    Backend,
+    DeviceBackend,
+    EvaluatorBackend,
+    ProcessBackend,
+    evaluate_expression,
+)
+from ipc.server.backend_pool import (
+    BackendPool,
+    BackendUnavailable,
+    CONSISTENT_HASH,
+    LEAST_OUTSTANDING,
+)
+
+test_cases = {
+    "3 + 4": ("7", 0),
+    "10 - 4": ("6", 0),
+    "5 * 3": ("15", 0),
+    "12 / 3": ("4", 0),
+    "5 / 2": ("2", 0),
+    "-7 / 2": ("-3", 0),                                # Truncates towards zero like C
+    "12/3": ("4", 0),
+    "2147483647 + 1": (None, errno.ERANGE),
+    "-2147483648 - 1": (None, errno.ERANGE),
+    "2147483647 * 2": (None, errno.EOVERFLOW),
+    "-2147483648 * 2": (None, errno.EOVERFLOW),
+    "10 / 0": (None, errno.EOVERFLOW),
+    "9999999999 + 1": (None, errno.ERANGE),
+    "a + b": (None, errno.EDOM),
+    "1 + 2 + 3": (None, errno.EDOM),
+    "3.5 + 4.2": (None, errno.EDOM),
+    "2147483647 / 0.5": (None, errno.EDOM),
+    "-2147483648 / -1": (None, errno.EOVERFLOW),
+    "1 % 2": (None, errno.EINVAL),
+    "+5 + 3": (None, errno.EDOM),                       # The kernel %lld rejects "+"
+    "5 + +3": (None, errno.EDOM),
+    "1(2": (None, errno.EDOM),                          # Parentheses before the operator check
+    "(1) + 2": (None, errno.EDOM),
+    "3 € 4": (None, errno.EDOM),                        # %c reads only the first UTF-8 byte
+}
+
+
+@pytest.mark.parametrize("expression, expected_result", test_cases.items())
+def test_evaluate_expression(expression, expected_result):
+    expected_output, expected_errno = expected_result
+    assert evaluate_expression(expression) == (expected_errno, expected_output)
+
+
+def test_backend_requires_evaluate():
+    class Incomplete(Backend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete")
+
+
+class FailingBackend(Backend):
+    def __init__(self):
+        super().__init__("failing")
+        self.calls = 0
+
+    def evaluate(self, expression):
+        self.calls += 1
+        return errno.EIO, None
+
+
+@pytest.mark.parametrize("strategy", [LEAST_OUTSTANDING, CONSISTENT_HASH])
+def test_pool_routes_around_failing_backend(strategy):
+    failing = FailingBackend()
+    pool = BackendPool([failing, EvaluatorBackend()], strategy)
+
+    for _ in range(10):
+        assert pool.execute("3 + 4") == (0, "7")
+
+    # Only the first request reaches the failing backend
+    assert failing.calls <= 1
+    stats = {entry["name"]: entry for entry in pool.stats()}
+    assert stats["evaluator"]["requests"] == 10
+
+
+def test_pool_compute_errors_keep_backend_healthy():
+    pool = BackendPool([EvaluatorBackend()])
+    assert pool.execute("10 / 0") == (errno.EOVERFLOW, None)
+    assert pool.stats()[0]["healthy"]
+
+
+def test_pool_without_healthy_backend():
+    pool = BackendPool([FailingBackend()])
+    with pytest.raises(BackendUnavailable):
+        pool.execute("3 + 4")
+
+
+def test_consistent_hash_is_stable():
+    pool = BackendPool(
+        [EvaluatorBackend(f"evaluator-{i}") for i in range(4)], CONSISTENT_HASH
+    )
+    first = pool._select_hashed("3 + 4", set())
+    assert all(pool._select_hashed("3 + 4", set()) is first for _ in range(5))
+
+
+def test_process_backend_forwards_stats(tmp_path):
+    stand_in = tmp_path / "math_chardev"
+    stand_in.write_bytes(b"")
+    backend = ProcessBackend(partial(DeviceBackend, str(stand_in)), "device")
+
+    assert backend.open()
+    assert backend.evaluate("7\n") == (0, "7")
+    assert backend.stats()["write"]["calls"] == 1
+    backend.shutdown()
+    # The last statistics of the child are kept for the shutdown summary
+    assert backend.stats()["read"]["calls"] == 1
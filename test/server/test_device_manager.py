@@ -0,0 +1,80 @@
+"""
+This module tests the raw file descriptor I/O of the DeviceManager
+against a regular file standing in for the math chardev.
+"""
+import errno
+import os
+
+from ipc.server.device_manager import DeviceManager
+
+
+def test_write_then_read_result(tmp_path):
+    stand_in = tmp_path / "math_chardev"
+    stand_in.write_bytes(b"")
+    device = DeviceManager(str(stand_in))
+    device.open_device()
+
+    assert device.write_to_device("-42\n") == 0
+    assert device.read_result() == -42
+    assert device.read_from_device() == "-42"
+    device.close_device()
+
+    stats = device.stats()
+    assert set(stats) == set(DeviceManager.OPERATIONS)
+    assert [stats[op]["calls"] for op in DeviceManager.OPERATIONS] == [1, 1, 1, 2]
+    assert not any(op["errors"] for op in stats.values())
+
+
+def test_read_garbage_fails(tmp_path):
+    stand_in = tmp_path / "math_chardev"
+    stand_in.write_bytes(b"not a number\n")
+    device = DeviceManager(str(stand_in))
+    device.open_device()
+
+    assert device.read_result() is None
+    assert device.stats()["read"]["errors"] == 1
+    device.close_device()
+
+
+def test_closed_device():
+    device = DeviceManager("/nonexistent/math_chardev")
+    device.open_device()
+
+    assert not device.is_open
+    assert device.write_to_device("3 + 4") is None
+    assert device.read_result() is None
+    assert device.stats()["open"]["errors"] == 1
+
+
+def test_io_errors_return_errno(tmp_path):
+    stand_in = tmp_path / "math_chardev"
+    stand_in.write_bytes(b"")
+    device = DeviceManager(str(stand_in))
+    device.open_device()
+    # Closing the descriptor out from under the manager makes the I/O fail with EBADF
+    os.close(device.fd)
+
+    assert device.write_to_device("3 + 4") == errno.EBADF
+    assert device.read_result() is None
+    stats = device.stats()
+    assert stats["write"]["errors"] == stats["write"]["calls"] == 1
+    assert stats["read"]["errors"] == stats["read"]["calls"] == 1
+    device.fd = None
+
+
+def test_latency_not_measured(tmp_path):
+    stand_in = tmp_path / "math_chardev"
+    stand_in.write_bytes(b"")
+    device = DeviceManager(str(stand_in), measure_latency=False)
+    device.open_device()
+    device.write_to_device("7\n")
+    device.read_result()
+    os.close(device.fd)
+    device.write_to_device("3 + 4")  # Error paths aren't timed either
+    device.fd = None
+    device.open_device()
+    device.close_device()
+
+    stats = device.stats()
+    assert all(stats[op]["calls"] for op in DeviceManager.OPERATIONS)
+    assert all(op["avg_us"] == 0.0 for op in stats.values())